@@ -28,25 +28,44 @@ The username of an user with administrative privileges, usually 'admin'.
 password
 *Required
 The password for your given admin account.
+
+timeout
+*Optional
+Number of seconds to wait for the router to respond, defaults to 10.
 """
 import logging
 from datetime import timedelta
 import re
 import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+# pylint: disable=import-error
+from requests.packages.urllib3.util.retry import Retry
 
 from homeassistant.const import CONF_HOST, CONF_USERNAME, CONF_PASSWORD
 from homeassistant.helpers import validate_config
-from homeassistant.util import Throttle
+from homeassistant.util import Throttle, convert
 from homeassistant.components.device_tracker import DOMAIN
 
 # Return cached results if last scan was less then this time ago
 MIN_TIME_BETWEEN_SCANS = timedelta(seconds=5)
 
+# Refresh names for unknown devices at most once within this time
+MIN_TIME_BETWEEN_NAME_REFRESHES = timedelta(seconds=30)
+
 _LOGGER = logging.getLogger(__name__)
 
+# seconds to wait for a response from the router
+CONF_TIMEOUT = "timeout"
+DEFAULT_TIMEOUT = 10
+
+# seconds to wait for a connection to the router
+CONNECT_TIMEOUT = 3
+
 _DDWRT_DATA_REGEX = re.compile(r'\{(\w+)::([^\}]*)\}')
-_MAC_REGEX = re.compile(r'(([0-9A-Fa-f]{1,2}\:){5}[0-9A-Fa-f]{1,2})')
+_FIELD_SEP = re.compile(r'[\'"],[\'"]')
+_MAC_REGEX = re.compile(r'(?:[0-9A-Fa-f]{1,2}\:){5}[0-9A-Fa-f]{1,2}')
 
 
 # pylint: disable=unused-argument
@@ -73,21 +92,41 @@ class DdWrtDeviceScanner(object):
         self.host = config[CONF_HOST]
         self.username = config[CONF_USERNAME]
         self.password = config[CONF_PASSWORD]
+        self.timeout = convert(config.get(CONF_TIMEOUT), int, DEFAULT_TIMEOUT)
 
         self.lock = threading.Lock()
 
-        self.last_results = {}
+        self.last_results = ()
+        # Raw wireless client list that last_results was parsed from
+        self._last_wireless = None
 
         self.mac2name = {}
+        self._name_cache_time = None
+
+        self._url_wireless = 'http://{}/Status_Wireless.live.asp'.format(
+            self.host)
+        self._url_lan = 'http://{}/Status_Lan.live.asp'.format(self.host)
+
+        # Reuse one keep-alive connection to the router for all requests and
+        # retry failed connections once and server errors with a short
+        # backoff. Read timeouts are not retried, so an unreachable router
+        # gives up after about two connect timeouts and a stalled one after
+        # a single read timeout.
+        retries = Retry(total=2, connect=1, read=False, backoff_factor=0.3,
+                        status_forcelist=(500, 502, 503, 504),
+                        raise_on_status=False)
+        self._session = requests.Session()
+        self._session.auth = (self.username, self.password)
+        self._session.mount('http://', HTTPAdapter(
+            pool_connections=2, pool_maxsize=4, max_retries=retries))
 
         # Test the router is accessible
-        url = 'http://{}/Status_Wireless.live.asp'.format(self.host)
-        data = self.get_ddwrt_data(url)
+        data = self.get_ddwrt_data(self._url_wireless)
         self.success_init = data is not None
 
     def scan_devices(self):
         """
-        Scans for new devices and return a list containing found device ids.
+        Scans for new devices and return a tuple containing found device ids.
         """
 
         self._update_info()
@@ -96,34 +135,18 @@ class DdWrtDeviceScanner(object):
 
     def get_device_name(self, device):
         """ Returns the name of the given device or None if we don't know. """
+        # mac2name is replaced on refresh, so only read it once
+        name = self.mac2name.get(device)
+        if name is not None:
+            return name
 
         with self.lock:
-            # if not initialised and not already scanned and not found
-            if device not in self.mac2name:
-                url = 'http://{}/Status_Lan.live.asp'.format(self.host)
-                data = self.get_ddwrt_data(url)
-
-                if not data:
-                    return None
-
-                dhcp_leases = data.get('dhcp_leases', None)
-
-                if not dhcp_leases:
-                    return None
-
-                # remove leading and trailing single quotes
-                cleaned_str = dhcp_leases.strip().strip('"')
-                elements = cleaned_str.split('","')
-                num_clients = int(len(elements)/5)
-                self.mac2name = {}
-                for idx in range(0, num_clients):
-                    # this is stupid but the data is a single array
-                    # every 5 elements represents one hosts, the MAC
-                    # is the third element and the name is the first
-                    mac_index = (idx * 5) + 2
-                    if mac_index < len(elements):
-                        mac = elements[mac_index]
-                        self.mac2name[mac] = elements[idx * 5]
+            if (self._name_cache_time is not None and
+                    time.monotonic() - self._name_cache_time <
+                    MIN_TIME_BETWEEN_NAME_REFRESHES.total_seconds()):
+                return None
+
+            self._update_mac2name()
 
             return self.mac2name.get(device)
 
@@ -137,44 +160,72 @@ class DdWrtDeviceScanner(object):
             return False
 
         with self.lock:
-            _LOGGER.info("Checking ARP")
+            _LOGGER.debug("Checking ARP")
 
-            url = 'http://{}/Status_Wireless.live.asp'.format(self.host)
-            data = self.get_ddwrt_data(url)
+            data = self.get_ddwrt_data(self._url_wireless)
 
             if not data:
                 return False
 
-            self.last_results = []
+            self._update_mac2name()
 
             active_clients = data.get('active_wireless', None)
             if not active_clients:
+                self.last_results = ()
+                self._last_wireless = None
                 return False
 
+            # Nothing to parse if the client list did not change
+            if active_clients == self._last_wireless:
+                return True
+
             # This is really lame, instead of using JSON the DD-WRT UI
             # uses its own data format for some reason and then
             # regex's out values so I guess I have to do the same,
             # LAME!!!
+            # The number of fields per client differs between DD-WRT
+            # versions, so find the MACs instead of relying on their index.
+            # Replace rather than mutate so callers get a consistent snapshot
+            self.last_results = tuple(_MAC_REGEX.findall(active_clients))
+            self._last_wireless = active_clients
 
-            # remove leading and trailing single quotes
-            clean_str = active_clients.strip().strip("'")
-            elements = clean_str.split("','")
+            return True
 
-            self.last_results.extend(item for item in elements
-                                     if _MAC_REGEX.match(item))
+    def _update_mac2name(self):
+        """ Refreshes the MAC to name mapping from the DHCP leases. """
+        self._name_cache_time = time.monotonic()
 
-            return True
+        data = self.get_ddwrt_data(self._url_lan)
+
+        if not data:
+            return
+
+        dhcp_leases = data.get('dhcp_leases', None)
+
+        if not dhcp_leases:
+            return
+
+        # remove leading and trailing quotes and split on the separators
+        elements = _FIELD_SEP.split(dhcp_leases.strip().strip('\'"'))
+        # this is stupid but the data is a single array
+        # every 5 elements represents one hosts, the MAC
+        # is the third element and the name is the first
+        fields = iter(elements)
+        mac2name = {mac: name for name, _, mac, _, _
+                    in zip(fields, fields, fields, fields, fields)}
+        self.mac2name = mac2name
 
     def get_ddwrt_data(self, url):
         """ Retrieve data from DD-WRT and return parsed result. """
         try:
-            response = requests.get(
-                url,
-                auth=(self.username, self.password),
-                timeout=4)
+            response = self._session.get(
+                url, timeout=(CONNECT_TIMEOUT, self.timeout))
         except requests.exceptions.Timeout:
             _LOGGER.exception("Connection to the router timed out")
             return
+        except requests.exceptions.ConnectionError:
+            _LOGGER.error("Unable to connect to the router at %s", self.host)
+            return
         if response.status_code == 200:
             return _parse_ddwrt_response(response.text)
         elif response.status_code == 401:
@@ -189,6 +240,5 @@ class DdWrtDeviceScanner(object):
 
 def _parse_ddwrt_response(data_str):
     """ Parse the DD-WRT data format. """
-    return {
-        key: val for key, val in _DDWRT_DATA_REGEX
-        .findall(data_str)}
+    return dict(match.group(1, 2) for match
+                in _DDWRT_DATA_REGEX.finditer(data_str))
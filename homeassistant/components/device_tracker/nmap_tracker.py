@@ -22,11 +22,15 @@ the range notation (192.168.1.1-255).
 home_interval
 *Optional
 Number of minutes it will not scan devices that it found in previous results.
-This is to save battery.
+This is to save battery. When not set, devices found in the last 30 seconds
+are not scanned again. Set to 0 to scan all devices every time.
 """
 import logging
 from datetime import timedelta
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import ipaddress
+import os
 import subprocess
 import re
 
@@ -44,8 +48,25 @@ _LOGGER = logging.getLogger(__name__)
 # interval in minutes to exclude devices from a scan while they are home
 CONF_HOME_INTERVAL = "home_interval"
 
+# interval to exclude devices from a scan when no home_interval is configured
+DEFAULT_HOME_INTERVAL = timedelta(seconds=30)
+
 REQUIREMENTS = ['python-nmap==0.4.3']
 
+# seconds to wait for the arp command
+ARP_TIMEOUT = 2
+
+# Kernel ARP table, available on Linux
+_PROC_ARP = '/proc/net/arp'
+_HAS_PROC_ARP = os.path.exists(_PROC_ARP)
+
+# number of nmap processes to run concurrently on a network prefix
+SCAN_WORKERS = 4
+
+NMAP_OPTIONS = "-F --host-timeout 5"
+
+_MAC_REGEX = re.compile(rb'(?:[0-9A-Fa-f]{1,2}\:){5}[0-9A-Fa-f]{1,2}')
+
 
 def get_scanner(hass, config):
     """ Validates config and returns a Nmap scanner. """
@@ -64,23 +85,80 @@ def _arp(ip_address):
     """ Get the MAC address for a given IP. """
     cmd = ['arp', '-n', ip_address]
     arp = subprocess.Popen(cmd, stdout=subprocess.PIPE)
-    out, _ = arp.communicate()
-    match = re.search(r'(([0-9A-Fa-f]{1,2}\:){5}[0-9A-Fa-f]{1,2})', str(out))
+    try:
+        out, _ = arp.communicate(timeout=ARP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        arp.kill()
+        arp.communicate()
+        _LOGGER.warning("arp lookup timed out for %s", ip_address)
+        return None
+    match = _MAC_REGEX.search(out)
     if match:
-        return match.group(0)
-    _LOGGER.info("No MAC address found for %s", ip_address)
+        return match.group(0).decode()
+    _LOGGER.debug("No MAC address found for %s", ip_address)
     return None
 
 
+def _load_arp_table():
+    """ Read the kernel ARP table and return a dict mapping IP to MAC. """
+    table = {}
+    with open(_PROC_ARP) as arp_file:
+        # skip the header line
+        for line in arp_file.readlines()[1:]:
+            parts = line.split()
+            if len(parts) >= 4 and parts[3] != '00:00:00:00:00:00':
+                table[parts[0]] = parts[3].upper()
+    return table
+
+
+def _mac_lookup():
+    """ Returns a function that gets the MAC address for a given IP. """
+    if _HAS_PROC_ARP:
+        try:
+            return _load_arp_table().get
+        except OSError:
+            _LOGGER.warning("Unable to read %s, using arp instead", _PROC_ARP)
+    return _arp
+
+
+def _split_cidr(hosts, count):
+    """
+    Splits a network prefix into up to count smaller prefixes.
+    Hosts in other notations are returned as a single chunk.
+    """
+    try:
+        network = ipaddress.ip_network(hosts, strict=False)
+    except ValueError:
+        return [hosts]
+
+    # every extra prefix bit doubles the number of subnets
+    prefixlen_diff = min(count.bit_length() - 1,
+                         network.max_prefixlen - network.prefixlen)
+
+    return [str(subnet) for subnet
+            in network.subnets(prefixlen_diff=prefixlen_diff)]
+
+
 class NmapDeviceScanner(object):
     """ This class scans for devices using nmap. """
 
     def __init__(self, config):
         self.last_results = []
+        self._mac_to_name = {}
 
         self.hosts = config[CONF_HOSTS]
-        minutes = convert(config.get(CONF_HOME_INTERVAL), int, 0)
-        self.home_interval = timedelta(minutes=minutes)
+        if config.get(CONF_HOME_INTERVAL) is None:
+            self.home_interval = DEFAULT_HOME_INTERVAL
+        else:
+            minutes = convert(config.get(CONF_HOME_INTERVAL), int, 0)
+            self.home_interval = timedelta(minutes=minutes)
+
+        self._chunks = _split_cidr(self.hosts, SCAN_WORKERS)
+
+        # PortScanner runs nmap to detect its version, so only create them
+        # once. Each chunk gets its own scanner as it stores the last result.
+        from nmap import PortScanner
+        self._scanners = [PortScanner() for _ in self._chunks]
 
         self.success_init = self._update_info()
         _LOGGER.info("nmap scanner initialized")
@@ -96,14 +174,7 @@ class NmapDeviceScanner(object):
 
     def get_device_name(self, mac):
         """ Returns the name of the given device or None if we don't know. """
-
-        filter_named = [device.name for device in self.last_results
-                        if device.mac == mac]
-
-        if filter_named:
-            return filter_named[0]
-        else:
-            return None
+        return self._mac_to_name.get(mac)
 
     @Throttle(MIN_TIME_BETWEEN_SCANS)
     def _update_info(self):
@@ -111,42 +182,55 @@ class NmapDeviceScanner(object):
         Scans the network for devices.
         Returns boolean if scanning successful.
         """
-        _LOGGER.info("Scanning")
-
-        from nmap import PortScanner, PortScannerError
-        scanner = PortScanner()
-
-        options = "-F --host-timeout 5"
-
-        if self.home_interval:
-            boundary = dt_util.now() - self.home_interval
-            last_results = [device for device in self.last_results
-                            if device.last_update > boundary]
-            if last_results:
-                # Pylint is confused here.
-                # pylint: disable=no-member
-                options += " --exclude {}".format(",".join(device.ip for device
-                                                           in last_results))
-        else:
-            last_results = []
+        _LOGGER.debug("Scanning")
+
+        from nmap import PortScannerError
+
+        options = NMAP_OPTIONS
+        now = dt_util.now()
+
+        boundary = now - self.home_interval
+        last_results = [device for device in self.last_results
+                        if device.last_update > boundary]
+        if last_results:
+            # Pylint is confused here.
+            # pylint: disable=no-member
+            options += " --exclude {}".format(",".join(device.ip for device
+                                                       in last_results))
 
         try:
-            result = scanner.scan(hosts=self.hosts, arguments=options)
+            scan_result = self._scan_chunks(options)
         except PortScannerError:
             return False
 
-        now = dt_util.now()
-        for ipv4, info in result['scan'].items():
+        lookup_mac = _mac_lookup()
+
+        for ipv4, info in scan_result.items():
             if info['status']['state'] != 'up':
                 continue
             name = info['hostnames'][0]['name'] if info['hostnames'] else ipv4
             # Mac address only returned if nmap ran as root
-            mac = info['addresses'].get('mac') or _arp(ipv4)
+            mac = info['addresses'].get('mac') or lookup_mac(ipv4)
             if mac is None:
                 continue
             last_results.append(Device(mac.upper(), name, ipv4, now))
 
         self.last_results = last_results
+        self._mac_to_name = {device.mac: device.name
+                             for device in last_results}
 
-        _LOGGER.info("nmap scan successful")
+        _LOGGER.debug("nmap scan successful")
         return True
+
+    def _scan_chunks(self, options):
+        """ Scans all chunks of the hosts concurrently and merges results. """
+        def scan_chunk(scanner, hosts):
+            """ Scans one chunk of the hosts. """
+            return scanner.scan(hosts=hosts, arguments=options)['scan']
+
+        scan_result = {}
+        with ThreadPoolExecutor(max_workers=len(self._chunks)) as pool:
+            for chunk_result in pool.map(scan_chunk, self._scanners,
+                                         self._chunks):
+                scan_result.update(chunk_result)
+        return scan_result
@@ -0,0 +1,103 @@
+"""
+tests.components.device_tracker.test_ddwrt
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Tests the DD-WRT device tracker platform.
+"""
+# pylint: disable=protected-access,too-many-public-methods
+import unittest
+from unittest.mock import patch
+
+from homeassistant.components.device_tracker import ddwrt
+from homeassistant.const import CONF_HOST, CONF_USERNAME, CONF_PASSWORD
+
+WIRELESS_DATA = {
+    'active_wireless': "'AA:BB:CC:DD:EE:01','eth1','0:01:02','54M','-60'",
+}
+# Two clients, each followed by its interface, uptime, rates and signal
+WIRELESS_DATA_TWO_CLIENTS = {
+    'active_wireless': (
+        "'AA:BB:CC:DD:EE:01','eth1','0:01:02','54M','54M','-60','-92','32',"
+        "'AA:BB:CC:DD:EE:02','eth1','12:34:56','11M','24M','-70','-92','22'"),
+}
+LAN_DATA = {
+    'dhcp_leases': '"host1","192.168.1.2","AA:BB:CC:DD:EE:01","1 day","2"',
+}
+
+
+class TestDdWrtDeviceScanner(unittest.TestCase):
+    """ Tests the DD-WRT device scanner. """
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """ Init needed objects. """
+        self.wireless_data = WIRELESS_DATA
+        self.get_data = patch.object(
+            ddwrt.DdWrtDeviceScanner, 'get_ddwrt_data',
+            side_effect=self._get_ddwrt_data).start()
+        self.addCleanup(patch.stopall)
+
+        self.scanner = ddwrt.DdWrtDeviceScanner({
+            CONF_HOST: '192.168.1.1',
+            CONF_USERNAME: 'admin',
+            CONF_PASSWORD: 'password',
+        })
+
+    def _get_ddwrt_data(self, url):
+        """ Returns canned router data for the given url. """
+        if url.endswith('/Status_Lan.live.asp'):
+            return LAN_DATA
+        return self.wireless_data
+
+    def _lan_requests(self):
+        """ Returns the number of DHCP lease requests made. """
+        return sum(1 for call in self.get_data.call_args_list
+                   if call[0][0] == self.scanner._url_lan)
+
+    def test_get_device_name(self):
+        """ Test device names come from the DHCP leases. """
+        self.assertEqual('host1',
+                         self.scanner.get_device_name('AA:BB:CC:DD:EE:01'))
+        self.assertEqual(1, self._lan_requests())
+
+    def test_unknown_device_name_throttled(self):
+        """ Test repeated misses do not refetch the DHCP leases. """
+        self.assertIsNone(self.scanner.get_device_name('AA:BB:CC:DD:EE:02'))
+        self.assertEqual(1, self._lan_requests())
+
+        self.assertIsNone(self.scanner.get_device_name('AA:BB:CC:DD:EE:02'))
+        self.assertEqual(1, self._lan_requests())
+
+    def test_scan_devices(self):
+        """ Test only the MAC addresses are taken from the client list. """
+        self.wireless_data = WIRELESS_DATA_TWO_CLIENTS
+
+        self.assertEqual(('AA:BB:CC:DD:EE:01', 'AA:BB:CC:DD:EE:02'),
+                         self.scanner.scan_devices())
+
+    def test_scan_devices_unchanged(self):
+        """ Test an unchanged client list is not parsed again. """
+        self.wireless_data = WIRELESS_DATA_TWO_CLIENTS
+        last_results = self.scanner.scan_devices()
+
+        self.wireless_data = dict(WIRELESS_DATA_TWO_CLIENTS)
+        self.assertTrue(self.scanner._update_info(no_throttle=True))
+        self.assertIs(last_results, self.scanner.last_results)
+
+        self.wireless_data = WIRELESS_DATA
+        self.assertTrue(self.scanner._update_info(no_throttle=True))
+        self.assertEqual(('AA:BB:CC:DD:EE:01',), self.scanner.last_results)
+
+    def test_scan_devices_no_clients(self):
+        """ Test an empty client list resets the last results. """
+        self.wireless_data = WIRELESS_DATA_TWO_CLIENTS
+        self.assertEqual(2, len(self.scanner.scan_devices()))
+
+        self.wireless_data = {'active_wireless': ''}
+        self.assertFalse(self.scanner._update_info(no_throttle=True))
+        self.assertEqual((), self.scanner.last_results)
+        self.assertIsNone(self.scanner._last_wireless)
+
+        self.wireless_data = WIRELESS_DATA_TWO_CLIENTS
+        self.assertTrue(self.scanner._update_info(no_throttle=True))
+        self.assertEqual(('AA:BB:CC:DD:EE:01', 'AA:BB:CC:DD:EE:02'),
+                         self.scanner.last_results)
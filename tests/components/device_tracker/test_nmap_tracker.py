@@ -0,0 +1,155 @@
+"""
+tests.components.device_tracker.test_nmap_tracker
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Tests the nmap device tracker platform.
+"""
+# pylint: disable=protected-access,too-many-public-methods
+import unittest
+from unittest.mock import MagicMock, mock_open, patch
+from datetime import timedelta
+
+from homeassistant.components.device_tracker import nmap_tracker
+from homeassistant.const import CONF_HOSTS
+
+PROC_ARP = (
+    "IP address       HW type     Flags       HW address            "
+    "Mask     Device\n"
+    "192.168.1.2      0x1         0x2         aa:bb:cc:dd:ee:ff     "
+    "*        eth0\n"
+    "192.168.1.3      0x1         0x0         00:00:00:00:00:00     "
+    "*        eth0\n"
+    "192.168.1.4      0x1         0x2         01:23:45:67:89:ab     "
+    "*        eth0\n")
+
+
+class PortScannerError(Exception):
+    """ Stub for nmap.PortScannerError. """
+
+
+class PortScanner(object):
+    """ Stub for nmap.PortScanner that returns canned results per hosts. """
+    # pylint: disable=too-few-public-methods
+    results = {}
+
+    def __init__(self):
+        self.calls = []
+
+    def scan(self, hosts, arguments):
+        """ Records the scan and returns the canned result for hosts. """
+        self.calls.append((hosts, arguments))
+        excluded = arguments.partition(' --exclude ')[2].split(',')
+        return {'scan': {ip: info for ip, info
+                         in self.results.get(hosts, {}).items()
+                         if ip not in excluded}}
+
+
+def host_up(mac=None):
+    """ Returns an nmap scan entry for a host that is up. """
+    return {
+        'status': {'state': 'up'},
+        'hostnames': [],
+        'addresses': {'mac': mac} if mac else {},
+    }
+
+
+NMAP = MagicMock(PortScanner=PortScanner, PortScannerError=PortScannerError)
+
+
+class TestNmapTracker(unittest.TestCase):
+    """ Tests the nmap device tracker platform. """
+
+    def test_load_arp_table(self):
+        """ Test parsing the kernel ARP table. """
+        with patch('builtins.open', mock_open(read_data=PROC_ARP)):
+            table = nmap_tracker._load_arp_table()
+
+        self.assertEqual({
+            '192.168.1.2': 'AA:BB:CC:DD:EE:FF',
+            '192.168.1.4': '01:23:45:67:89:AB',
+        }, table)
+
+    def test_split_cidr(self):
+        """ Test splitting a network prefix into chunks. """
+        self.assertEqual(
+            ['192.168.1.0/26', '192.168.1.64/26',
+             '192.168.1.128/26', '192.168.1.192/26'],
+            nmap_tracker._split_cidr('192.168.1.0/24', 4))
+
+    def test_split_cidr_not_power_of_two(self):
+        """ Test the number of chunks never exceeds the requested count. """
+        self.assertEqual(['192.168.1.0/25', '192.168.1.128/25'],
+                         nmap_tracker._split_cidr('192.168.1.0/24', 3))
+
+    def test_split_cidr_range_notation(self):
+        """ Test hosts in range notation are scanned as one chunk. """
+        self.assertEqual(['192.168.1.1-255'],
+                         nmap_tracker._split_cidr('192.168.1.1-255', 4))
+
+    def test_split_cidr_small_network(self):
+        """ Test networks too small to split into the requested chunks. """
+        self.assertEqual(['192.168.1.0/32', '192.168.1.1/32'],
+                         nmap_tracker._split_cidr('192.168.1.0/31', 4))
+        self.assertEqual(['192.168.1.5/32'],
+                         nmap_tracker._split_cidr('192.168.1.5', 4))
+
+    @patch.dict('sys.modules', nmap=MagicMock())
+    def test_default_home_interval(self):
+        """ Test recently seen devices are excluded when not configured. """
+        scanner = nmap_tracker.NmapDeviceScanner({
+            CONF_HOSTS: '192.168.1.0/24'})
+
+        self.assertEqual(nmap_tracker.DEFAULT_HOME_INTERVAL,
+                         scanner.home_interval)
+
+    @patch.dict('sys.modules', nmap=MagicMock())
+    def test_home_interval_disabled(self):
+        """ Test a home interval of 0 keeps scanning all devices. """
+        scanner = nmap_tracker.NmapDeviceScanner({
+            CONF_HOSTS: '192.168.1.0/24',
+            nmap_tracker.CONF_HOME_INTERVAL: 0})
+
+        self.assertEqual(timedelta(), scanner.home_interval)
+
+    @patch.dict('sys.modules', nmap=NMAP)
+    @patch.object(PortScanner, 'results',
+                  {'192.168.1.5/32': {'192.168.1.5': host_up()}})
+    @patch.object(nmap_tracker, '_arp', return_value='aa:bb:cc:dd:ee:ff')
+    @patch.object(nmap_tracker, '_load_arp_table', side_effect=OSError)
+    @patch.object(nmap_tracker, '_HAS_PROC_ARP', True)
+    def test_unreadable_arp_table(self, mock_load, mock_arp):
+        """ Test falling back to arp when the ARP table cannot be read. """
+        scanner = nmap_tracker.NmapDeviceScanner({CONF_HOSTS: '192.168.1.5'})
+
+        self.assertTrue(scanner.success_init)
+        self.assertEqual(1, mock_load.call_count)
+        mock_arp.assert_called_once_with('192.168.1.5')
+        self.assertEqual(['AA:BB:CC:DD:EE:FF'], scanner.scan_devices())
+
+    @patch.dict('sys.modules', nmap=NMAP)
+    @patch.object(PortScanner, 'results', {
+        '192.168.1.0/26': {'192.168.1.2': host_up('aa:bb:cc:dd:ee:01')},
+        '192.168.1.64/26': {'192.168.1.70': host_up('aa:bb:cc:dd:ee:02')},
+    })
+    def test_scan_chunks(self):
+        """ Test chunk results are merged and exclusions reach all chunks. """
+        scanner = nmap_tracker.NmapDeviceScanner({
+            CONF_HOSTS: '192.168.1.0/24'})
+
+        self.assertEqual(['AA:BB:CC:DD:EE:01', 'AA:BB:CC:DD:EE:02'],
+                         sorted(scanner.scan_devices()))
+        self.assertEqual(
+            ['192.168.1.0/26', '192.168.1.64/26',
+             '192.168.1.128/26', '192.168.1.192/26'],
+            [port_scanner.calls[0][0] for port_scanner in scanner._scanners])
+
+        self.assertTrue(scanner._update_info(no_throttle=True))
+
+        for port_scanner in scanner._scanners:
+            hosts, arguments = port_scanner.calls[-1]
+            self.assertTrue(arguments.startswith(nmap_tracker.NMAP_OPTIONS))
+            excluded = arguments.split(' --exclude ')[1].split(',')
+            self.assertEqual(['192.168.1.2', '192.168.1.70'],
+                             sorted(excluded), hosts)
+        self.assertEqual(['AA:BB:CC:DD:EE:01', 'AA:BB:CC:DD:EE:02'],
+                         sorted(scanner.scan_devices()))